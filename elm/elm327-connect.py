@@ -4,10 +4,18 @@
 Позволяет отправлять AT команды и получать ответы
 """
 
+import array
+import fcntl
+import os
+import select
 import serial
+import termios
 import time
 import sys
 
+# Флаг драйвера tty, отключающий задержку (latency timer) при передаче данных
+ASYNC_LOW_LATENCY = 0x2000
+
 def connect_elm327(device_path="/dev/rfcomm0", baudrate=38400):
     """Подключение к ELM327 через serial порт"""
     try:
@@ -22,11 +30,26 @@ def connect_elm327(device_path="/dev/rfcomm0", baudrate=38400):
         )
         
         print(f"Подключено к {device_path} на скорости {baudrate} бод")
+        set_low_latency(ser)
         return ser
     except Exception as e:
         print(f"Ошибка подключения: {e}")
         return None
 
+def set_low_latency(ser):
+    """Включение режима ASYNC_LOW_LATENCY для serial порта (TIOCGSERIAL/TIOCSSERIAL)"""
+    try:
+        # struct serial_struct: поле flags - пятое int-значение
+        buf = array.array('i', [0] * 32)
+        fcntl.ioctl(ser.fileno(), termios.TIOCGSERIAL, buf)
+        buf[4] |= ASYNC_LOW_LATENCY
+        fcntl.ioctl(ser.fileno(), termios.TIOCSSERIAL, buf)
+        print("Включен режим ASYNC_LOW_LATENCY")
+    except (OSError, AttributeError):
+        # Не все драйверы (например, rfcomm) поддерживают эти ioctl, а на части платформ
+        # в termios нет TIOCGSERIAL: это не ошибка подключения, работаем без режима
+        pass
+
 def send_command(ser, command):
     """Отправка команды в ELM327 и получение ответа"""
     try:
@@ -40,21 +63,29 @@ def send_command(ser, command):
         
         print(f"Отправлена команда: {command}")
         
-        # Ожидание и чтение ответа
-        time.sleep(0.1)
-        response = ""
-        start_time = time.time()
+        # Ожидание ответа через select вместо опроса с time.sleep,
+        # байты накапливаются в bytearray без конкатенации строк
+        buf = bytearray()
+        fd = ser.fileno()
+        deadline = time.monotonic() + 3  # тайм-аут 3 секунды
         
-        while time.time() - start_time < 3:  # тайм-аут 3 секунды
-            if ser.in_waiting > 0:
-                data = ser.read(ser.in_waiting).decode('ascii', errors='ignore')
-                response += data
-                if '>' in data:  # Промпт ELM327
-                    break
-            time.sleep(0.01)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                break
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            buf.extend(chunk)
+            if b'>' in chunk:  # Промпт ELM327
+                break
         
-        print(f"Ответ: {response.strip()}")
-        return response.strip()
+        response = buf.decode('ascii', errors='ignore').strip()
+        print(f"Ответ: {response}")
+        return response
         
     except Exception as e:
         print(f"Ошибка при отправке команды: {e}")
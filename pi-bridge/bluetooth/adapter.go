@@ -2,13 +2,17 @@ package bluetooth
 
 import (
 	"bufio"
+	"bytes"
 	"fmt"
 	"io"
 	"log"
 	"os"
 	"sync"
+	"sync/atomic"
 	"time"
 
+	"elm327-bridge/common"
+
 	"golang.org/x/sys/unix"
 )
 
@@ -16,18 +20,21 @@ var logger = log.New(os.Stdout, "[Bluetooth-Adapter] ", log.LstdFlags|log.Lshort
 
 // Config представляет конфигурацию для Bluetooth адаптера
 type Config struct {
-	DevicePath        string        `yaml:"device_path"`        // Путь к устройству, например "/dev/rfcomm0"
-	ReconnectInterval time.Duration `yaml:"reconnect_interval"` // Интервал переподключения при ошибках
-	ConnectTimeout    time.Duration `yaml:"connect_timeout"`    // Таймаут на подключение
-	ReadTimeout       time.Duration `yaml:"read_timeout"`       // Таймаут на чтение
-	WriteTimeout      time.Duration `yaml:"write_timeout"`      // Таймаут на запись
-	InitCommands      []string      `yaml:"init_commands"`      // Команды для инициализации ELM327
+	DevicePath        string        `yaml:"device_path" mapstructure:"device_path"`               // Путь к устройству, например "/dev/rfcomm0"
+	MACAddress        string        `yaml:"mac_address" mapstructure:"mac_address"`               // MAC-адрес ELM327 для прямого RFCOMM-сокета (вместо DevicePath)
+	Channel           uint8         `yaml:"channel" mapstructure:"channel"`                       // RFCOMM канал (SPP обычно 1)
+	ReconnectInterval time.Duration `yaml:"reconnect_interval" mapstructure:"reconnect_interval"` // Интервал переподключения при ошибках
+	ConnectTimeout    time.Duration `yaml:"connect_timeout" mapstructure:"connect_timeout"`       // Таймаут на подключение
+	ReadTimeout       time.Duration `yaml:"read_timeout" mapstructure:"read_timeout"`             // Таймаут на чтение
+	WriteTimeout      time.Duration `yaml:"write_timeout" mapstructure:"write_timeout"`           // Таймаут на запись
+	InitCommands      []string      `yaml:"init_commands" mapstructure:"init_commands"`           // Команды для инициализации ELM327
 }
 
 // DefaultConfig возвращает конфигурацию по умолчанию
 func DefaultConfig() Config {
 	return Config{
 		DevicePath:        "/dev/rfcomm0",
+		Channel:           1,
 		ReconnectInterval: 5 * time.Second,
 		ConnectTimeout:    10 * time.Second,
 		ReadTimeout:       3 * time.Second,
@@ -42,30 +49,46 @@ func DefaultConfig() Config {
 	}
 }
 
+// connection оборачивает io.ReadWriteCloser для хранения в atomic.Pointer
+type connection struct {
+	io.ReadWriteCloser
+}
+
 // Adapter представляет Bluetooth адаптер для работы с ELM327
 type Adapter struct {
 	config        Config
-	conn          io.ReadWriteCloser
-	connMutex     sync.RWMutex
-	responsesChan chan<- string  // Канал для отправки ответов (только для записи)
-	commandsChan  <-chan string  // Канал для получения команд (только для чтения)
-	stopChan      chan struct{}  // Канал для graceful shutdown
-	wg            sync.WaitGroup // WaitGroup для синхронизации горутин
+	conn          atomic.Pointer[connection] // Текущее соединение, читается без блокировок
+	responsesChan chan<- string              // Канал для отправки ответов (только для записи)
+	commandsChan  <-chan string              // Канал для получения команд (только для чтения)
+	stopChan      chan struct{}              // Канал для graceful shutdown
+	connectedChan chan struct{}              // Сигнал об установке соединения (для readLoop)
+	lostChan      chan struct{}              // Сигнал о разрыве соединения (для reconnectLoop)
+	wg            sync.WaitGroup             // WaitGroup для синхронизации горутин
+
+	dial func() (io.ReadWriteCloser, error) // Открывает соединение с устройством (подменяется в тестах)
 }
 
 // NewAdapter создает новый Bluetooth адаптер
 func NewAdapter(config Config, responsesChan chan<- string, commandsChan <-chan string) *Adapter {
-	return &Adapter{
+	a := &Adapter{
 		config:        config,
 		responsesChan: responsesChan,
 		commandsChan:  commandsChan,
 		stopChan:      make(chan struct{}),
+		connectedChan: make(chan struct{}, 1),
+		lostChan:      make(chan struct{}, 1),
 	}
+	a.dial = a.dialDevice
+	return a
 }
 
 // Start запускает работу адаптера
 func (a *Adapter) Start() error {
-	logger.Printf("Starting Bluetooth adapter with device: %s", a.config.DevicePath)
+	if a.config.MACAddress != "" {
+		logger.Printf("Starting Bluetooth adapter with RFCOMM socket to %s (channel %d)", a.config.MACAddress, a.config.Channel)
+	} else {
+		logger.Printf("Starting Bluetooth adapter with device: %s", a.config.DevicePath)
+	}
 
 	// Запускаем горутину для чтения данных
 	a.wg.Add(1)
@@ -88,12 +111,9 @@ func (a *Adapter) Stop() error {
 	close(a.stopChan)
 	a.wg.Wait()
 
-	a.connMutex.Lock()
-	if a.conn != nil {
-		a.conn.Close()
-		a.conn = nil
+	if conn := a.conn.Swap(nil); conn != nil {
+		conn.Close()
 	}
-	a.connMutex.Unlock()
 
 	logger.Println("Bluetooth adapter stopped")
 	return nil
@@ -101,81 +121,143 @@ func (a *Adapter) Stop() error {
 
 // isConnected проверяет, подключен ли адаптер
 func (a *Adapter) isConnected() bool {
-	a.connMutex.RLock()
-	defer a.connMutex.RUnlock()
-	return a.conn != nil
+	return a.conn.Load() != nil
 }
 
 // setConnection устанавливает соединение
-func (a *Adapter) setConnection(conn io.ReadWriteCloser) {
-	a.connMutex.Lock()
-	a.conn = conn
-	a.connMutex.Unlock()
+func (a *Adapter) setConnection(conn io.ReadWriteCloser) *connection {
+	c := &connection{conn}
+	a.conn.Store(c)
+	notify(a.connectedChan)
 	logger.Println("Bluetooth connection established")
+	return c
 }
 
-// getConnection получает соединение
-func (a *Adapter) getConnection() io.ReadWriteCloser {
-	a.connMutex.RLock()
-	defer a.connMutex.RUnlock()
-	return a.conn
+// closeConnection закрывает соединение conn, только если оно все еще текущее:
+// ошибка на старом соединении не должна закрывать уже установленное новое
+func (a *Adapter) closeConnection(conn *connection) {
+	if conn == nil || !a.conn.CompareAndSwap(conn, nil) {
+		return
+	}
+	conn.Close()
+	notify(a.lostChan)
+	logger.Println("Bluetooth connection closed")
 }
 
-// closeConnection закрывает текущее соединение
-func (a *Adapter) closeConnection() {
-	a.connMutex.Lock()
-	if a.conn != nil {
-		a.conn.Close()
-		a.conn = nil
+// notify отправляет сигнал в буферизованный канал, не блокируясь, если сигнал уже ожидает
+func notify(ch chan struct{}) {
+	select {
+	case ch <- struct{}{}:
+	default:
 	}
-	a.connMutex.Unlock()
-	logger.Println("Bluetooth connection closed")
 }
 
 // connect устанавливает соединение с устройством
 func (a *Adapter) connect() error {
-	logger.Printf("Attempting to connect to %s", a.config.DevicePath)
-
-	// Проверяем, существует ли устройство
-	if _, err := os.Stat(a.config.DevicePath); os.IsNotExist(err) {
-		return fmt.Errorf("device %s does not exist. Please run 'sudo rfcomm bind' first", a.config.DevicePath)
+	conn, err := a.dial()
+	if err != nil {
+		return err
 	}
 
-	// Открываем устройство
-	file, err := os.OpenFile(a.config.DevicePath, os.O_RDWR|unix.O_NOCTTY|os.O_SYNC, 0666)
+	return a.initConnection(conn)
+}
+
+// dialDevice открывает RFCOMM-сокет по MAC-адресу или tty-устройство, созданное 'rfcomm bind'
+func (a *Adapter) dialDevice() (io.ReadWriteCloser, error) {
+	var (
+		file *os.File
+		err  error
+	)
+
+	if a.config.MACAddress != "" {
+		// Прямой RFCOMM-сокет, без tty-слоя /dev/rfcommN и 'rfcomm bind'
+		channel := a.config.Channel
+		if channel == 0 {
+			channel = 1
+		}
+		logger.Printf("Attempting to connect to %s (RFCOMM channel %d)", a.config.MACAddress, channel)
+		file, err = dialRFCOMM(a.config.MACAddress, channel, a.config.ConnectTimeout)
+	} else {
+		logger.Printf("Attempting to connect to %s", a.config.DevicePath)
+		file, err = openDevice(a.config.DevicePath)
+	}
 	if err != nil {
-		return fmt.Errorf("failed to open %s: %v", a.config.DevicePath, err)
+		return nil, err
 	}
 
-	// Устанавливаем соединение
-	a.setConnection(file)
+	return file, nil
+}
 
-	// Выполняем инициализацию ELM327
-	if err := a.initializeELM327(); err != nil {
-		a.closeConnection()
+// initConnection инициализирует ELM327 на новом соединении и только затем делает его текущим.
+// До этого момента readLoop и writeLoop соединения не видят и не перехватывают ответы инициализации
+func (a *Adapter) initConnection(conn io.ReadWriteCloser) error {
+	if err := a.initializeELM327(conn); err != nil {
+		conn.Close()
 		return fmt.Errorf("failed to initialize ELM327: %v", err)
 	}
 
+	a.setConnection(conn)
 	return nil
 }
 
-// initializeELM327 выполняет инициализацию ELM327 после подключения
-func (a *Adapter) initializeELM327() error {
-	conn := a.getConnection()
-	if conn == nil {
-		return fmt.Errorf("no connection available for initialization")
+// setWriteDeadline устанавливает таймаут на запись, если соединение его поддерживает.
+// os.OpenFile сам переводит tty в неблокирующий режим и регистрирует его в netpoller'е Go,
+// поэтому зависшая запись прерывается по таймауту, не занимая поток ОС
+func (a *Adapter) setWriteDeadline(conn io.ReadWriteCloser) {
+	if a.config.WriteTimeout <= 0 {
+		return
+	}
+	if d, ok := conn.(interface{ SetWriteDeadline(time.Time) error }); ok {
+		d.SetWriteDeadline(time.Now().Add(a.config.WriteTimeout))
+	}
+}
+
+// setReadDeadline устанавливает таймаут на чтение, если соединение его поддерживает.
+// Нулевое время снимает таймаут
+func setReadDeadline(conn io.ReadWriteCloser, t time.Time) {
+	if d, ok := conn.(interface{ SetReadDeadline(time.Time) error }); ok {
+		d.SetReadDeadline(t)
+	}
+}
+
+// openDevice открывает tty-устройство, созданное 'rfcomm bind'
+func openDevice(path string) (*os.File, error) {
+	// Проверяем, существует ли устройство
+	if _, err := os.Stat(path); os.IsNotExist(err) {
+		return nil, fmt.Errorf("device %s does not exist. Please run 'sudo rfcomm bind' first", path)
+	}
+
+	// Открываем устройство без O_NONBLOCK: с ним open(2) на /dev/rfcommN не ждет
+	// установки RFCOMM-соединения. Регистрацию в netpoller os.OpenFile выполняет сам
+	file, err := os.OpenFile(path, os.O_RDWR|unix.O_NOCTTY|os.O_SYNC, 0666)
+	if err != nil {
+		return nil, fmt.Errorf("failed to open %s: %v", path, err)
 	}
 
+	return file, nil
+}
+
+// initializeELM327 выполняет инициализацию ELM327 после подключения.
+// Соединение еще не опубликовано, поэтому блокировка записи не нужна
+func (a *Adapter) initializeELM327(conn io.ReadWriteCloser) error {
 	logger.Println("Initializing ELM327...")
 
+	// Молчащее устройство не должно подвешивать инициализацию: таймаут снимается после нее,
+	// так как readLoop ждет ответов без ограничения по времени
+	defer setReadDeadline(conn, time.Time{})
+
 	// Небольшая пауза после подключения
 	time.Sleep(500 * time.Millisecond)
 
+	// Буфер для ответов на команды инициализации
+	response := make([]byte, 128)
+
 	// Отправляем команды инициализации последовательно
 	for i, cmd := range a.config.InitCommands {
 		logger.Printf("Sending init command %d/%d: %s", i+1, len(a.config.InitCommands), cmd)
 
 		cmdBytes := []byte(cmd + "\r")
+		a.setWriteDeadline(conn)
 		if _, err := conn.Write(cmdBytes); err != nil {
 			return fmt.Errorf("failed to send command %s: %v", cmd, err)
 		}
@@ -184,7 +266,9 @@ func (a *Adapter) initializeELM327() error {
 		time.Sleep(200 * time.Millisecond)
 
 		// Читаем ответ
-		response := make([]byte, 128)
+		if a.config.ReadTimeout > 0 {
+			setReadDeadline(conn, time.Now().Add(a.config.ReadTimeout))
+		}
 		n, err := conn.Read(response)
 		if err != nil {
 			logger.Printf("Warning: No response to %s (err: %v). Continuing...", cmd, err)
@@ -203,6 +287,13 @@ func (a *Adapter) readLoop() {
 	defer a.wg.Done()
 	logger.Println("Starting Bluetooth read loop")
 
+	// Reader живет все время жизни соединения, чтобы не терять уже буферизованные данные
+	var (
+		reader     *bufio.Reader
+		readerConn *connection
+		frame      []byte // Переиспользуемый буфер для ответа
+	)
+
 	for {
 		select {
 		case <-a.stopChan:
@@ -211,41 +302,82 @@ func (a *Adapter) readLoop() {
 		default:
 		}
 
-		conn := a.getConnection()
+		conn := a.conn.Load()
 		if conn == nil {
-			time.Sleep(a.config.ReconnectInterval)
+			// Ждем установки соединения вместо периодической проверки
+			select {
+			case <-a.stopChan:
+				logger.Println("Read loop stopped")
+				return
+			case <-a.connectedChan:
+			}
 			continue
 		}
 
-		// Создаем reader с таймаутом
-		reader := bufio.NewReader(conn)
+		// Создаем новый reader только при смене соединения
+		if conn != readerConn {
+			reader = bufio.NewReader(conn)
+			readerConn = conn
+		}
 
-		// Читаем до символа '>' (конец ответа ELM327)
-		data, err := reader.ReadBytes('>')
+		// Читаем до символа '>' (конец ответа ELM327) в переиспользуемый буфер
+		var err error
+		frame, err = readResponse(reader, frame[:0])
 		if err != nil {
 			logger.Printf("Read error: %v", err)
-			a.closeConnection()
-			time.Sleep(a.config.ReconnectInterval)
+			a.closeConnection(conn)
 			continue
 		}
 
 		// Удаляем trailing '>' если есть
-		response := string(data)
-		if len(response) > 0 && response[len(response)-1] == '>' {
-			response = response[:len(response)-1]
+		if len(frame) > 0 && frame[len(frame)-1] == '>' {
+			frame = frame[:len(frame)-1]
+		}
+
+		// Ответ может содержать несколько кадров, разделенных '\r':
+		// отправляем каждый кадр отдельным сообщением
+		for _, response := range splitFrames(frame) {
+			if common.DebugEnabled() {
+				logger.Printf("Received from ELM327: %q", response)
+			}
+
+			// Отправляем ответ в канал (неблокирующе)
+			select {
+			case a.responsesChan <- response:
+				// Ответ отправлен успешно
+			default:
+				logger.Printf("Warning: responses channel is full, dropping response: %q", response)
+			}
 		}
+	}
+}
 
-		// Убираем лишние пробелы
-		response = fmt.Sprintf("%s", response)
+// splitFrames разбивает ответ ELM327 на кадры по символу '\r', пропуская пустые строки
+func splitFrames(data []byte) []string {
+	frames := make([]string, 0, 1)
+	for len(data) > 0 {
+		line := data
+		if i := bytes.IndexByte(data, '\r'); i >= 0 {
+			line, data = data[:i], data[i+1:]
+		} else {
+			data = nil
+		}
 
-		logger.Printf("Received from ELM327: %q", response)
+		if line = bytes.TrimSpace(line); len(line) > 0 {
+			frames = append(frames, string(line))
+		}
+	}
+	return frames
+}
 
-		// Отправляем ответ в канал (неблокирующе)
-		select {
-		case a.responsesChan <- response:
-			// Ответ отправлен успешно
-		default:
-			logger.Printf("Warning: responses channel is full, dropping response: %q", response)
+// readResponse дописывает в buf данные до символа '>' включительно.
+// В отличие от ReadBytes не выделяет новый срез на каждый ответ
+func readResponse(reader *bufio.Reader, buf []byte) ([]byte, error) {
+	for {
+		chunk, err := reader.ReadSlice('>')
+		buf = append(buf, chunk...)
+		if err != bufio.ErrBufferFull {
+			return buf, err
 		}
 	}
 }
@@ -266,26 +398,30 @@ func (a *Adapter) writeLoop() {
 				return
 			}
 
-			conn := a.getConnection()
+			conn := a.conn.Load()
 			if conn == nil {
 				logger.Printf("Cannot send command %q: no connection", command)
 				continue
 			}
 
-			logger.Printf("Sending command to ELM327: %q", command)
+			if common.DebugEnabled() {
+				logger.Printf("Sending command to ELM327: %q", command)
+			}
 
 			// Добавляем символ возврата каретки
 			cmdBytes := []byte(command + "\r")
 
-			// TODO: Установить таймаут на запись при использовании net.Conn вместо io.ReadWriteCloser
-			_, err := conn.Write(cmdBytes)
-			if err != nil {
+			// Пишет только writeLoop: инициализация идет до публикации соединения
+			a.setWriteDeadline(conn)
+			if _, err := conn.Write(cmdBytes); err != nil {
 				logger.Printf("Write error: %v", err)
-				a.closeConnection()
+				a.closeConnection(conn)
 				continue
 			}
 
-			logger.Printf("Command sent successfully: %q", command)
+			if common.DebugEnabled() {
+				logger.Printf("Command sent successfully: %q", command)
+			}
 		}
 	}
 }
@@ -296,25 +432,39 @@ func (a *Adapter) reconnectLoop() {
 	logger.Println("Starting Bluetooth reconnect loop")
 
 	// Первая попытка подключения
-	if err := a.connect(); err != nil {
+	err := a.connect()
+	if err != nil {
 		logger.Printf("Initial connection failed: %v", err)
 	}
 
-	ticker := time.NewTicker(a.config.ReconnectInterval)
-	defer ticker.Stop()
-
 	for {
-		select {
-		case <-a.stopChan:
-			logger.Println("Reconnect loop stopped")
-			return
-		case <-ticker.C:
-			if !a.isConnected() {
-				logger.Println("Attempting to reconnect...")
-				if err := a.connect(); err != nil {
-					logger.Printf("Reconnection failed: %v", err)
-				}
+		if err == nil {
+			// Соединение установлено: ждем сигнала о разрыве вместо периодической проверки
+			select {
+			case <-a.stopChan:
+				logger.Println("Reconnect loop stopped")
+				return
+			case <-a.lostChan:
+			}
+		} else {
+			// Попытка не удалась: повторяем через ReconnectInterval
+			select {
+			case <-a.stopChan:
+				logger.Println("Reconnect loop stopped")
+				return
+			case <-time.After(a.config.ReconnectInterval):
 			}
 		}
+
+		// Сигнал мог остаться от предыдущего соединения
+		if a.isConnected() {
+			err = nil
+			continue
+		}
+
+		logger.Println("Attempting to reconnect...")
+		if err = a.connect(); err != nil {
+			logger.Printf("Reconnection failed: %v", err)
+		}
 	}
 }
@@ -1,7 +1,10 @@
 package bluetooth
 
 import (
+	"bufio"
+	"errors"
 	"io"
+	"net"
 	"strings"
 	"testing"
 	"time"
@@ -158,6 +161,7 @@ func TestAdapterWithMockConnection(t *testing.T) {
 	adapter.setConnection(mockConn)
 
 	// Запускаем только writeLoop для тестирования записи
+	adapter.wg.Add(1)
 	go adapter.writeLoop()
 
 	// Тестируем отправку команды
@@ -176,6 +180,7 @@ func TestAdapterWithMockConnection(t *testing.T) {
 	}()
 
 	// Запускаем только readLoop для тестирования чтения
+	adapter.wg.Add(1)
 	go adapter.readLoop()
 
 	// Ждем получения данных
@@ -190,3 +195,370 @@ func TestAdapterWithMockConnection(t *testing.T) {
 
 	adapter.Stop()
 }
+
+func TestCloseConnectionIgnoresStaleConnection(t *testing.T) {
+	adapter := NewAdapter(DefaultConfig(), make(chan string, 1), make(chan string, 1))
+
+	oldMock := &MockReadWriteCloser{}
+	oldConn := adapter.setConnection(oldMock)
+	adapter.closeConnection(oldConn)
+
+	// Ошибка записи на старом соединении приходит уже после переподключения
+	newMock := &MockReadWriteCloser{}
+	newConn := adapter.setConnection(newMock)
+	adapter.closeConnection(oldConn)
+
+	if newMock.closed {
+		t.Error("Stale close must not close the new connection")
+	}
+	if adapter.conn.Load() != newConn {
+		t.Error("Expected new connection to stay current")
+	}
+
+	adapter.closeConnection(newConn)
+	if !newMock.closed || adapter.isConnected() {
+		t.Error("Expected current connection to be closed")
+	}
+}
+
+func TestReadLoopKeepsBufferedResponses(t *testing.T) {
+	// Два ответа приходят одним куском данных
+	mockConn := &MockReadWriteCloser{
+		readData: []byte("OK>41 0C 1A F0>"),
+	}
+
+	responsesChan := make(chan string, 10)
+	commandsChan := make(chan string, 10)
+
+	config := DefaultConfig()
+	config.ReconnectInterval = 10 * time.Millisecond
+	adapter := NewAdapter(config, responsesChan, commandsChan)
+	adapter.setConnection(mockConn)
+
+	adapter.wg.Add(1)
+	go adapter.readLoop()
+	defer adapter.Stop()
+
+	for _, expected := range []string{"OK", "41 0C 1A F0"} {
+		select {
+		case response := <-responsesChan:
+			if response != expected {
+				t.Errorf("Expected response %q, got %q", expected, response)
+			}
+		case <-time.After(1 * time.Second):
+			t.Fatalf("Timeout waiting for response %q", expected)
+		}
+	}
+}
+
+func TestReadResponseReusesBuffer(t *testing.T) {
+	// Ответ длиннее внутреннего буфера reader'а
+	long := strings.Repeat("41 0C 1A F0\r", 4) + ">"
+	reader := bufio.NewReaderSize(strings.NewReader(long+"OK>"), 16)
+
+	buf := make([]byte, 0, 64)
+	frame, err := readResponse(reader, buf)
+	if err != nil {
+		t.Fatalf("readResponse failed: %v", err)
+	}
+	if string(frame) != long {
+		t.Errorf("Expected %q, got %q", long, string(frame))
+	}
+
+	frame, err = readResponse(reader, frame[:0])
+	if err != nil {
+		t.Fatalf("readResponse failed: %v", err)
+	}
+	if string(frame) != "OK>" {
+		t.Errorf("Expected %q, got %q", "OK>", string(frame))
+	}
+	if &frame[0] != &buf[:1][0] {
+		t.Error("Expected buffer to be reused")
+	}
+}
+
+// fakeELM327 отвечает "OK" на каждую команду и передает полученные команды в канал
+func fakeELM327(conn net.Conn, commands chan<- string) {
+	reader := bufio.NewReader(conn)
+	for {
+		line, err := reader.ReadString('\r')
+		if err != nil {
+			return
+		}
+		commands <- strings.TrimSuffix(line, "\r")
+		if _, err := conn.Write([]byte("OK\r\r>")); err != nil {
+			return
+		}
+	}
+}
+
+func TestInitConnectionThenCommand(t *testing.T) {
+	deviceConn, elmConn := net.Pipe()
+	received := make(chan string, 10)
+	go fakeELM327(elmConn, received)
+
+	responsesChan := make(chan string, 10)
+	commandsChan := make(chan string, 10)
+
+	config := DefaultConfig()
+	config.InitCommands = []string{"ATZ", "ATE0"}
+	adapter := NewAdapter(config, responsesChan, commandsChan)
+
+	adapter.wg.Add(2)
+	go adapter.readLoop()
+	go adapter.writeLoop()
+
+	if err := adapter.initConnection(deviceConn); err != nil {
+		t.Fatalf("initConnection failed: %v", err)
+	}
+
+	// Ответы на команды инициализации читает initializeELM327, а не readLoop
+	select {
+	case response := <-responsesChan:
+		t.Fatalf("Unexpected init response in responses channel: %q", response)
+	default:
+	}
+
+	commandsChan <- "010C"
+
+	for _, expected := range []string{"ATZ", "ATE0", "010C"} {
+		select {
+		case command := <-received:
+			if command != expected {
+				t.Errorf("Expected command %q, got %q", expected, command)
+			}
+		case <-time.After(time.Second):
+			t.Fatalf("Timeout waiting for command %q", expected)
+		}
+	}
+
+	select {
+	case response := <-responsesChan:
+		if response != "OK" {
+			t.Errorf("Expected response OK, got %q", response)
+		}
+	case <-time.After(time.Second):
+		t.Fatal("Timeout waiting for command response")
+	}
+
+	// Закрытие со стороны устройства завершает чтение в readLoop
+	elmConn.Close()
+	adapter.Stop()
+}
+
+func TestInitConnectionSilentDevice(t *testing.T) {
+	deviceConn, elmConn := net.Pipe()
+	defer elmConn.Close()
+
+	// Устройство принимает команды, но не отвечает
+	go io.Copy(io.Discard, elmConn)
+
+	config := DefaultConfig()
+	config.InitCommands = []string{"ATZ"}
+	config.ReadTimeout = 50 * time.Millisecond
+	adapter := NewAdapter(config, make(chan string, 1), make(chan string, 1))
+
+	done := make(chan error, 1)
+	go func() {
+		done <- adapter.initConnection(deviceConn)
+	}()
+
+	select {
+	case err := <-done:
+		if err != nil {
+			t.Fatalf("initConnection failed: %v", err)
+		}
+	case <-time.After(5 * time.Second):
+		t.Fatal("Initialization hangs on a silent device")
+	}
+	if !adapter.isConnected() {
+		t.Fatal("Expected connection to be set after initialization")
+	}
+
+	// Таймаут на чтение снят: ответ позже ReadTimeout все еще читается
+	go func() {
+		time.Sleep(2 * config.ReadTimeout)
+		elmConn.Write([]byte("OK>"))
+	}()
+	buf := make([]byte, 8)
+	if _, err := deviceConn.Read(buf); err != nil {
+		t.Errorf("Expected read deadline to be cleared, got %v", err)
+	}
+
+	adapter.closeConnection(adapter.conn.Load())
+}
+
+// deadlineReadWriteCloser дополнительно запоминает установленный таймаут на запись
+type deadlineReadWriteCloser struct {
+	MockReadWriteCloser
+	writeDeadline time.Time
+}
+
+func (m *deadlineReadWriteCloser) SetWriteDeadline(t time.Time) error {
+	m.writeDeadline = t
+	return nil
+}
+
+func TestSetWriteDeadline(t *testing.T) {
+	config := DefaultConfig()
+	adapter := NewAdapter(config, make(chan string, 1), make(chan string, 1))
+
+	conn := &deadlineReadWriteCloser{}
+	adapter.setWriteDeadline(conn)
+
+	if conn.writeDeadline.IsZero() {
+		t.Fatal("Expected write deadline to be set")
+	}
+	if time.Until(conn.writeDeadline) > config.WriteTimeout {
+		t.Errorf("Expected write deadline within %v, got %v", config.WriteTimeout, time.Until(conn.writeDeadline))
+	}
+
+	// Соединения без поддержки таймаутов пропускаются
+	adapter.setWriteDeadline(&MockReadWriteCloser{})
+}
+
+func TestSplitFrames(t *testing.T) {
+	frames := splitFrames([]byte("SEARCHING...\r41 0C 1A F0\r\r41 0D 3C \r\n"))
+
+	expected := []string{"SEARCHING...", "41 0C 1A F0", "41 0D 3C"}
+	if len(frames) != len(expected) {
+		t.Fatalf("Expected %d frames, got %d: %q", len(expected), len(frames), frames)
+	}
+	for i := range expected {
+		if frames[i] != expected[i] {
+			t.Errorf("Expected frame %d to be %q, got %q", i, expected[i], frames[i])
+		}
+	}
+
+	if frames := splitFrames([]byte("\r\r")); len(frames) != 0 {
+		t.Errorf("Expected no frames, got %q", frames)
+	}
+}
+
+// fakeDialer подменяет Adapter.dial: первые failures попыток завершаются ошибкой,
+// время каждой попытки отправляется в attempts
+type fakeDialer struct {
+	failures int
+	attempts chan time.Time
+}
+
+func (d *fakeDialer) dial() (io.ReadWriteCloser, error) {
+	d.attempts <- time.Now()
+	if d.failures > 0 {
+		d.failures--
+		return nil, errors.New("device unavailable")
+	}
+	return &MockReadWriteCloser{}, nil
+}
+
+// startReconnectLoop запускает только reconnectLoop с подмененным dial
+func startReconnectLoop(d *fakeDialer, interval time.Duration) *Adapter {
+	config := DefaultConfig()
+	config.ReconnectInterval = interval
+	config.InitCommands = nil
+
+	adapter := NewAdapter(config, make(chan string, 1), make(chan string, 1))
+	adapter.dial = d.dial
+
+	adapter.wg.Add(1)
+	go adapter.reconnectLoop()
+	return adapter
+}
+
+func waitAttempt(t *testing.T, d *fakeDialer, timeout time.Duration) time.Time {
+	t.Helper()
+	select {
+	case at := <-d.attempts:
+		return at
+	case <-time.After(timeout):
+		t.Fatal("Timeout waiting for connection attempt")
+		return time.Time{}
+	}
+}
+
+func waitConnected(t *testing.T, adapter *Adapter) {
+	t.Helper()
+	deadline := time.Now().Add(2 * time.Second)
+	for !adapter.isConnected() {
+		if time.Now().After(deadline) {
+			t.Fatal("Timeout waiting for connection")
+		}
+		time.Sleep(10 * time.Millisecond)
+	}
+}
+
+func TestReconnectLoopReconnectsImmediatelyAfterLoss(t *testing.T) {
+	d := &fakeDialer{attempts: make(chan time.Time, 10)}
+
+	// ReconnectInterval не должен задерживать переподключение после разрыва
+	adapter := startReconnectLoop(d, time.Hour)
+	defer adapter.Stop()
+
+	waitAttempt(t, d, time.Second)
+	waitConnected(t, adapter)
+
+	adapter.closeConnection(adapter.conn.Load())
+
+	waitAttempt(t, d, time.Second)
+	waitConnected(t, adapter)
+}
+
+func TestReconnectLoopRetriesAfterInterval(t *testing.T) {
+	d := &fakeDialer{failures: 1, attempts: make(chan time.Time, 10)}
+	interval := 100 * time.Millisecond
+
+	adapter := startReconnectLoop(d, interval)
+	defer adapter.Stop()
+
+	first := waitAttempt(t, d, time.Second)
+	second := waitAttempt(t, d, time.Second)
+	if elapsed := second.Sub(first); elapsed < interval {
+		t.Errorf("Expected retry after %v, got %v", interval, elapsed)
+	}
+
+	waitConnected(t, adapter)
+}
+
+func TestReconnectLoopIgnoresStaleSignal(t *testing.T) {
+	d := &fakeDialer{attempts: make(chan time.Time, 10)}
+
+	adapter := startReconnectLoop(d, 50*time.Millisecond)
+	defer adapter.Stop()
+
+	waitAttempt(t, d, time.Second)
+	waitConnected(t, adapter)
+
+	// Сигнал от предыдущего соединения при активном соединении не вызывает переподключения
+	notify(adapter.lostChan)
+
+	select {
+	case <-d.attempts:
+		t.Error("Unexpected reconnect while connected")
+	case <-time.After(300 * time.Millisecond):
+	}
+	if !adapter.isConnected() {
+		t.Error("Expected connection to stay active")
+	}
+}
+
+func TestReadLoopWakesOnConnection(t *testing.T) {
+	responsesChan := make(chan string, 10)
+	adapter := NewAdapter(DefaultConfig(), responsesChan, make(chan string, 1))
+
+	adapter.wg.Add(1)
+	go adapter.readLoop()
+	defer adapter.Stop()
+
+	// readLoop ждет сигнала connectedChan и начинает чтение сразу после установки соединения
+	time.Sleep(50 * time.Millisecond)
+	adapter.setConnection(&MockReadWriteCloser{readData: []byte("OK>")})
+
+	select {
+	case response := <-responsesChan:
+		if response != "OK" {
+			t.Errorf("Expected response OK, got %q", response)
+		}
+	case <-time.After(time.Second):
+		t.Fatal("Timeout waiting for readLoop to pick up the connection")
+	}
+}
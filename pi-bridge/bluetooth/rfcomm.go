@@ -0,0 +1,22 @@
+package bluetooth
+
+import (
+	"fmt"
+	"net"
+)
+
+// parseBDAddr разбирает MAC-адрес вида "00:11:22:33:44:55" в bdaddr_t,
+// где байты хранятся в обратном порядке (младший байт первым)
+func parseBDAddr(mac string) ([6]uint8, error) {
+	var addr [6]uint8
+
+	hw, err := net.ParseMAC(mac)
+	if err != nil || len(hw) != len(addr) {
+		return addr, fmt.Errorf("invalid Bluetooth address %q", mac)
+	}
+
+	for i := range addr {
+		addr[i] = hw[len(hw)-1-i]
+	}
+	return addr, nil
+}
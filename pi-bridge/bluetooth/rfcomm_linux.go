@@ -0,0 +1,77 @@
+//go:build linux
+
+package bluetooth
+
+import (
+	"fmt"
+	"os"
+	"time"
+
+	"golang.org/x/sys/unix"
+)
+
+// dialRFCOMM открывает RFCOMM-сокет к устройству напрямую.
+// Сокет создается неблокирующим, поэтому os.NewFile регистрирует его
+// в netpoller так же, как tty-устройство из openDevice
+func dialRFCOMM(mac string, channel uint8, timeout time.Duration) (*os.File, error) {
+	addr, err := parseBDAddr(mac)
+	if err != nil {
+		return nil, err
+	}
+
+	fd, err := unix.Socket(unix.AF_BLUETOOTH, unix.SOCK_STREAM|unix.SOCK_CLOEXEC|unix.SOCK_NONBLOCK, unix.BTPROTO_RFCOMM)
+	if err != nil {
+		return nil, fmt.Errorf("failed to create RFCOMM socket: %v", err)
+	}
+
+	// Неблокирующий connect: блокирующий прерывался бы сигналами рантайма Go (EINTR)
+	err = unix.Connect(fd, &unix.SockaddrRFCOMM{Addr: addr, Channel: channel})
+	if err == unix.EINPROGRESS || err == unix.EINTR {
+		err = waitConnect(fd, timeout)
+	}
+	if err != nil {
+		unix.Close(fd)
+		return nil, fmt.Errorf("failed to connect to %s (channel %d): %v", mac, channel, err)
+	}
+
+	return os.NewFile(uintptr(fd), "rfcomm:"+mac), nil
+}
+
+// waitConnect ждет завершения неблокирующего connect не дольше timeout (0 - без ограничения)
+func waitConnect(fd int, timeout time.Duration) error {
+	var deadline time.Time
+	if timeout > 0 {
+		deadline = time.Now().Add(timeout)
+	}
+
+	for {
+		waitMs := -1
+		if !deadline.IsZero() {
+			remaining := time.Until(deadline)
+			if remaining <= 0 {
+				return unix.ETIMEDOUT
+			}
+			waitMs = int((remaining + time.Millisecond - 1) / time.Millisecond)
+		}
+
+		fds := []unix.PollFd{{Fd: int32(fd), Events: unix.POLLOUT}}
+		n, err := unix.Poll(fds, waitMs)
+		if err == unix.EINTR || (err == nil && n == 0) {
+			// Прервано сигналом или истек интервал: проверяем deadline и ждем дальше
+			continue
+		}
+		if err != nil {
+			return err
+		}
+
+		// Результат connect сообщается через SO_ERROR
+		soErr, err := unix.GetsockoptInt(fd, unix.SOL_SOCKET, unix.SO_ERROR)
+		if err != nil {
+			return err
+		}
+		if soErr != 0 {
+			return unix.Errno(soErr)
+		}
+		return nil
+	}
+}
@@ -0,0 +1,14 @@
+//go:build !linux
+
+package bluetooth
+
+import (
+	"fmt"
+	"os"
+	"time"
+)
+
+// dialRFCOMM доступен только в Linux (BlueZ), на других ОС используйте device_path
+func dialRFCOMM(mac string, channel uint8, timeout time.Duration) (*os.File, error) {
+	return nil, fmt.Errorf("direct RFCOMM sockets are only supported on Linux, use device_path instead")
+}
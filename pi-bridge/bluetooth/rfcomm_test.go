@@ -0,0 +1,23 @@
+package bluetooth
+
+import "testing"
+
+func TestParseBDAddr(t *testing.T) {
+	addr, err := parseBDAddr("00:11:22:33:44:55")
+	if err != nil {
+		t.Fatalf("parseBDAddr failed: %v", err)
+	}
+
+	expected := [6]uint8{0x55, 0x44, 0x33, 0x22, 0x11, 0x00}
+	if addr != expected {
+		t.Errorf("Expected %X, got %X", expected, addr)
+	}
+}
+
+func TestParseBDAddrInvalid(t *testing.T) {
+	for _, mac := range []string{"", "XX:XX:XX:XX:XX:XX", "00:11:22:33:44:55:66:77"} {
+		if _, err := parseBDAddr(mac); err == nil {
+			t.Errorf("Expected error for %q", mac)
+		}
+	}
+}
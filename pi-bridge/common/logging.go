@@ -0,0 +1,17 @@
+package common
+
+import "sync/atomic"
+
+// debugLogging включает логирование каждого сообщения (уровень "debug")
+var debugLogging atomic.Bool
+
+// SetDebugLogging включает или отключает логирование каждого сообщения
+func SetDebugLogging(enabled bool) {
+	debugLogging.Store(enabled)
+}
+
+// DebugEnabled сообщает, включено ли логирование каждого сообщения.
+// Проверяется до вызова Printf, чтобы не форматировать строки на горячем пути впустую
+func DebugEnabled() bool {
+	return debugLogging.Load()
+}
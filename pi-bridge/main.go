@@ -5,9 +5,11 @@ import (
 	"log"
 	"os"
 	"os/signal"
+	"strings"
 	"syscall"
 
 	"elm327-bridge/bluetooth"
+	"elm327-bridge/common"
 	"elm327-bridge/mqtt"
 	"elm327-bridge/obd"
 
@@ -50,10 +52,7 @@ func loadConfig() error {
 
 // validateConfig проверяет корректность конфигурации
 func validateConfig() error {
-	if config.Bluetooth.DevicePath == "" {
-		config.Bluetooth = bluetooth.DefaultConfig()
-		logger.Println("Using default Bluetooth configuration")
-	}
+	applyBluetoothDefaults(&config.Bluetooth)
 
 	if config.MQTT.Broker == "" {
 		return fmt.Errorf("MQTT broker address must be set in config.yaml")
@@ -62,6 +61,35 @@ func validateConfig() error {
 	return nil
 }
 
+// applyBluetoothDefaults заполняет незаданные параметры Bluetooth значениями по умолчанию
+func applyBluetoothDefaults(cfg *bluetooth.Config) {
+	defaults := bluetooth.DefaultConfig()
+
+	// MAC-адрес заменяет путь к устройству, путь по умолчанию нужен только без него
+	if cfg.DevicePath == "" && cfg.MACAddress == "" {
+		cfg.DevicePath = defaults.DevicePath
+		logger.Printf("Bluetooth device_path is not set, using %s", cfg.DevicePath)
+	}
+	if cfg.Channel == 0 {
+		cfg.Channel = defaults.Channel
+	}
+	if cfg.ReconnectInterval == 0 {
+		cfg.ReconnectInterval = defaults.ReconnectInterval
+	}
+	if cfg.ConnectTimeout == 0 {
+		cfg.ConnectTimeout = defaults.ConnectTimeout
+	}
+	if cfg.ReadTimeout == 0 {
+		cfg.ReadTimeout = defaults.ReadTimeout
+	}
+	if cfg.WriteTimeout == 0 {
+		cfg.WriteTimeout = defaults.WriteTimeout
+	}
+	if len(cfg.InitCommands) == 0 {
+		cfg.InitCommands = defaults.InitCommands
+	}
+}
+
 // main функция приложения
 func main() {
 	logger.Println("Starting ELM327 Bridge...")
@@ -71,6 +99,9 @@ func main() {
 		logger.Fatalf("Failed to load config: %v", err)
 	}
 
+	// Логирование каждого сообщения включается только на уровне debug
+	common.SetDebugLogging(strings.EqualFold(config.Logging.Level, "debug"))
+
 	// Создаем каналы для связи между модулями
 	responsesChan := make(chan string, 50)                     // Сырые ответы от ELM327
 	commandsChan := make(chan string, 20)                      // Команды для отправки в ELM327
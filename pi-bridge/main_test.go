@@ -0,0 +1,96 @@
+package main
+
+import (
+	"strings"
+	"testing"
+	"time"
+
+	"elm327-bridge/bluetooth"
+
+	"github.com/spf13/viper"
+)
+
+// loadTestConfig загружает YAML через viper так же, как loadConfig, и валидирует результат
+func loadTestConfig(t *testing.T, yaml string) {
+	t.Helper()
+
+	v := viper.New()
+	v.SetConfigType("yaml")
+	if err := v.ReadConfig(strings.NewReader(yaml)); err != nil {
+		t.Fatalf("Failed to read config: %v", err)
+	}
+
+	config = Config{}
+	t.Cleanup(func() { config = Config{} })
+
+	if err := v.Unmarshal(&config); err != nil {
+		t.Fatalf("Failed to unmarshal config: %v", err)
+	}
+	if err := validateConfig(); err != nil {
+		t.Fatalf("validateConfig failed: %v", err)
+	}
+}
+
+func TestLoadBluetoothConfigFromYAML(t *testing.T) {
+	loadTestConfig(t, `
+bluetooth:
+  device_path: "/dev/rfcomm1"
+  reconnect_interval: "2s"
+  connect_timeout: "4s"
+  read_timeout: "1500ms"
+  write_timeout: "500ms"
+  init_commands:
+    - "ATZ"
+    - "ATSP6"
+mqtt:
+  broker: "tcp://localhost:1883"
+`)
+
+	bt := config.Bluetooth
+	if bt.DevicePath != "/dev/rfcomm1" {
+		t.Errorf("Expected device path /dev/rfcomm1, got %q", bt.DevicePath)
+	}
+	if bt.ReconnectInterval != 2*time.Second || bt.ConnectTimeout != 4*time.Second {
+		t.Errorf("Unexpected reconnect/connect timeouts: %v, %v", bt.ReconnectInterval, bt.ConnectTimeout)
+	}
+	if bt.ReadTimeout != 1500*time.Millisecond || bt.WriteTimeout != 500*time.Millisecond {
+		t.Errorf("Unexpected read/write timeouts: %v, %v", bt.ReadTimeout, bt.WriteTimeout)
+	}
+	if len(bt.InitCommands) != 2 || bt.InitCommands[1] != "ATSP6" {
+		t.Errorf("Unexpected init commands: %v", bt.InitCommands)
+	}
+}
+
+func TestLoadBluetoothMACAddressFromYAML(t *testing.T) {
+	loadTestConfig(t, `
+bluetooth:
+  mac_address: "00:1D:A5:68:98:8B"
+  channel: 2
+  read_timeout: "5s"
+mqtt:
+  broker: "tcp://localhost:1883"
+`)
+
+	bt := config.Bluetooth
+	if bt.MACAddress != "00:1D:A5:68:98:8B" {
+		t.Errorf("Expected MAC address 00:1D:A5:68:98:8B, got %q", bt.MACAddress)
+	}
+	if bt.Channel != 2 {
+		t.Errorf("Expected channel 2, got %d", bt.Channel)
+	}
+	if bt.DevicePath != "" {
+		t.Errorf("Expected no default device path with MAC address, got %q", bt.DevicePath)
+	}
+
+	// Заданное значение сохраняется, незаданные заполняются по умолчанию
+	defaults := bluetooth.DefaultConfig()
+	if bt.ReadTimeout != 5*time.Second {
+		t.Errorf("Expected read timeout 5s, got %v", bt.ReadTimeout)
+	}
+	if bt.ReconnectInterval != defaults.ReconnectInterval {
+		t.Errorf("Expected default reconnect interval, got %v", bt.ReconnectInterval)
+	}
+	if len(bt.InitCommands) != len(defaults.InitCommands) {
+		t.Errorf("Expected default init commands, got %v", bt.InitCommands)
+	}
+}
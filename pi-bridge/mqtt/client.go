@@ -1,6 +1,7 @@
 package mqtt
 
 import (
+	"bytes"
 	"crypto/rand"
 	"elm327-bridge/common"
 	"encoding/hex"
@@ -9,6 +10,7 @@ import (
 	"log"
 	"os"
 	"sync"
+	"sync/atomic"
 	"time"
 
 	mqttLib "github.com/eclipse/paho.mqtt.golang"
@@ -28,6 +30,35 @@ type Config struct {
 	AutoReconnect  bool          `yaml:"auto_reconnect"`  // Автоматическое переподключение
 }
 
+const (
+	// maxPublishBatch ограничивает количество сообщений телеметрии, публикуемых одной пачкой
+	maxPublishBatch = 64
+
+	// maxPooledPayload - буферы большего размера не возвращаются в пул
+	maxPooledPayload = 64 * 1024
+)
+
+// payloadBuffer - буфер JSON payload вместе с Encoder, пишущим в него.
+// Encoder переиспользуется с буфером, а не создается на каждую публикацию
+type payloadBuffer struct {
+	bytes.Buffer
+	enc *json.Encoder
+}
+
+// newPayloadBuffer создает пустой буфер payload со своим Encoder
+func newPayloadBuffer() *payloadBuffer {
+	p := &payloadBuffer{}
+	p.enc = json.NewEncoder(&p.Buffer)
+	return p
+}
+
+// payloadPool переиспользует буферы JSON payload телеметрии между публикациями
+var payloadPool = sync.Pool{
+	New: func() interface{} {
+		return newPayloadBuffer()
+	},
+}
+
 // generateClientID генерирует случайный ID клиента
 func generateClientID() string {
 	bytes := make([]byte, 4)
@@ -76,7 +107,8 @@ type Client struct {
 	stopChan         chan struct{}
 	wg               sync.WaitGroup
 	logger           *log.Logger
-	vin              string // VIN автомобиля (определяется динамически)
+	vin              string      // VIN автомобиля (определяется динамически)
+	connected        atomic.Bool // Состояние соединения, обновляется обработчиками paho
 }
 
 // NewClient создает нового MQTT клиента
@@ -140,12 +172,14 @@ func (c *Client) Stop() error {
 		c.mqttClient.Disconnect(1000)
 		c.logger.Println("MQTT client disconnected")
 	}
+	c.connected.Store(false)
 
 	return nil
 }
 
 // onConnectHandler вызывается при успешном подключении к брокеру
 func (c *Client) onConnectHandler(client mqttLib.Client) {
+	c.connected.Store(true)
 	c.logger.Println("Connected to MQTT broker")
 
 	// Подписываемся на топики команд
@@ -167,6 +201,9 @@ func (c *Client) onConnectHandler(client mqttLib.Client) {
 
 // onConnectionLostHandler вызывается при потере соединения
 func (c *Client) onConnectionLostHandler(client mqttLib.Client, err error) {
+	// Как и paho IsConnected, при AutoReconnect считаем клиент подключенным на время
+	// переподключения: paho сохраняет публикации с QoS > 0 и отправит их после восстановления
+	c.connected.Store(c.config.AutoReconnect)
 	c.logger.Printf("Connection lost: %v", err)
 }
 
@@ -177,7 +214,9 @@ func (c *Client) onReconnectingHandler(client mqttLib.Client, opts *mqttLib.Clie
 
 // onCommandReceived обрабатывает входящие команды
 func (c *Client) onCommandReceived(client mqttLib.Client, msg mqttLib.Message) {
-	c.logger.Printf("Received command on topic: %s", msg.Topic())
+	if common.DebugEnabled() {
+		c.logger.Printf("Received command on topic: %s", msg.Topic())
+	}
 
 	var cmd CommandMessage
 	if err := json.Unmarshal(msg.Payload(), &cmd); err != nil {
@@ -185,14 +224,19 @@ func (c *Client) onCommandReceived(client mqttLib.Client, msg mqttLib.Message) {
 		return
 	}
 
-	c.logger.Printf("Processing command: %s (correlation_id: %s)", cmd.Command, cmd.CorrelationID)
+	if common.DebugEnabled() {
+		c.logger.Printf("Processing command: %s (correlation_id: %s)", cmd.Command, cmd.CorrelationID)
+	}
 
-	// Отправляем команду в канал для Bluetooth модуля
+	// Обработчик вызывается из сетевого цикла paho по порядку поступления команд,
+	// поэтому не блокируется: при заполненном канале команда отбрасывается
 	select {
 	case c.commandsChan <- cmd.Command:
-		c.logger.Printf("Command sent to Bluetooth: %s", cmd.Command)
-	case <-time.After(5 * time.Second):
-		c.logger.Printf("Timeout sending command to Bluetooth: %s", cmd.Command)
+		if common.DebugEnabled() {
+			c.logger.Printf("Command sent to Bluetooth: %s", cmd.Command)
+		}
+	default:
+		c.logger.Printf("Warning: commands channel is full, dropping command: %s", cmd.Command)
 	}
 }
 
@@ -212,17 +256,84 @@ func (c *Client) publishTelemetryLoop() {
 				return
 			}
 
-			// Конвертируем данные в TelemetryMessage
-			msg, err := c.convertToTelemetryMessage(telemetryData)
-			if err != nil {
-				c.logger.Printf("Failed to convert telemetry data: %v", err)
-				continue
-			}
+			// Забираем все уже накопившиеся сообщения и публикуем их одной пачкой
+			batch := drainTelemetry(c.telemetryChan, telemetryData, maxPublishBatch)
+			c.publishTelemetryBatch(batch)
+		}
+	}
+}
 
-			// Публикуем в MQTT
-			if err := c.publishTelemetry(msg); err != nil {
-				c.logger.Printf("Failed to publish telemetry: %v", err)
+// drainTelemetry собирает пачку из первого элемента и тех, что уже ожидают в канале (не блокируется)
+func drainTelemetry(telemetryChan <-chan interface{}, first interface{}, maxBatch int) []interface{} {
+	batch := make([]interface{}, 1, maxBatch)
+	batch[0] = first
+
+	for len(batch) < maxBatch {
+		select {
+		case telemetryData, ok := <-telemetryChan:
+			if !ok {
+				return batch
 			}
+			batch = append(batch, telemetryData)
+		default:
+			return batch
+		}
+	}
+
+	return batch
+}
+
+// pendingPublish описывает отправленное, но еще не подтвержденное сообщение телеметрии
+type pendingPublish struct {
+	token mqttLib.Token
+	topic string
+	msg   *TelemetryMessage
+	buf   *payloadBuffer // Буфер payload из payloadPool
+}
+
+// publishTelemetryBatch публикует пачку телеметрии и ждет подтверждения всех сообщений разом,
+// а не по одному round-trip к брокеру на каждое сообщение
+func (c *Client) publishTelemetryBatch(batch []interface{}) {
+	pending := make([]pendingPublish, 0, len(batch))
+
+	for _, telemetryData := range batch {
+		// Конвертируем данные в TelemetryMessage
+		msg, err := c.convertToTelemetryMessage(telemetryData)
+		if err != nil {
+			c.logger.Printf("Failed to convert telemetry data: %v", err)
+			continue
+		}
+
+		// Публикуем в MQTT без ожидания подтверждения
+		p, err := c.publishTelemetry(msg)
+		if err != nil {
+			c.logger.Printf("Failed to publish telemetry: %v", err)
+			continue
+		}
+
+		pending = append(pending, p)
+	}
+
+	c.awaitPublishes(pending)
+}
+
+// awaitPublishes дожидается подтверждения отправленных сообщений телеметрии
+// и возвращает в пул буферы только успешно доставленных
+func (c *Client) awaitPublishes(pending []pendingPublish) {
+	for _, p := range pending {
+		p.token.Wait()
+
+		if p.token.Error() != nil {
+			// Буфер не возвращаем в пул: paho может еще хранить payload для повторной отправки
+			c.logger.Printf("Failed to publish telemetry to topic %s: %v", p.topic, p.token.Error())
+			continue
+		}
+
+		// Брокер подтвердил доставку, payload больше не используется
+		releasePayload(p.buf)
+
+		if common.DebugEnabled() {
+			c.logger.Printf("Published telemetry to %s: %.2f %s", p.topic, p.msg.Value, p.msg.Unit)
 		}
 	}
 }
@@ -253,8 +364,16 @@ func (c *Client) publishResponsesLoop() {
 
 // convertToTelemetryMessage конвертирует данные телеметрии в MQTT сообщение
 func (c *Client) convertToTelemetryMessage(data interface{}) (*TelemetryMessage, error) {
-	// Пытаемся привести к типу common.Telemetry
-	if telemetry, ok := data.(common.Telemetry); ok {
+	// Парсер OBD отправляет *common.Telemetry, значение тоже принимаем
+	var telemetry *common.Telemetry
+	switch t := data.(type) {
+	case *common.Telemetry:
+		telemetry = t
+	case common.Telemetry:
+		telemetry = &t
+	}
+
+	if telemetry != nil {
 		return &TelemetryMessage{
 			VIN:       c.vin, // TODO: Получить реальный VIN
 			PID:       telemetry.PID,
@@ -269,36 +388,45 @@ func (c *Client) convertToTelemetryMessage(data interface{}) (*TelemetryMessage,
 	return nil, fmt.Errorf("unsupported telemetry data type: %T", data)
 }
 
-// publishTelemetry публикует данные телеметрии в MQTT
-func (c *Client) publishTelemetry(msg *TelemetryMessage) error {
-	if c.mqttClient == nil || !c.mqttClient.IsConnected() {
-		return fmt.Errorf("MQTT client not connected")
+// publishTelemetry отправляет данные телеметрии в MQTT, не дожидаясь подтверждения.
+// Payload сериализуется в буфер из payloadPool, который освобождается после подтверждения
+func (c *Client) publishTelemetry(msg *TelemetryMessage) (pendingPublish, error) {
+	if !c.IsConnected() {
+		return pendingPublish{}, fmt.Errorf("MQTT client not connected")
 	}
 
 	// Создаем JSON payload
-	payload, err := json.Marshal(msg)
-	if err != nil {
-		return fmt.Errorf("failed to marshal telemetry message: %v", err)
+	buf := payloadPool.Get().(*payloadBuffer)
+	if err := buf.enc.Encode(msg); err != nil {
+		releasePayload(buf)
+		return pendingPublish{}, fmt.Errorf("failed to marshal telemetry message: %v", err)
 	}
 
+	// Encoder добавляет перевод строки, в payload он не нужен
+	payload := bytes.TrimSuffix(buf.Bytes(), []byte("\n"))
+
 	// Создаем топик
 	topic := fmt.Sprintf("%s/%s/%s", c.config.DataTopic, c.vin, msg.Metric)
 
 	// Публикуем
 	token := c.mqttClient.Publish(topic, c.config.QoS, false, payload)
-	token.Wait()
+	return pendingPublish{token: token, topic: topic, msg: msg, buf: buf}, nil
+}
 
-	if token.Error() != nil {
-		return fmt.Errorf("failed to publish to topic %s: %v", topic, token.Error())
+// releasePayload очищает буфер payload и возвращает его в пул.
+// Возвращает false, если буфер слишком большой и оставлен сборщику мусора
+func releasePayload(buf *payloadBuffer) bool {
+	if buf.Cap() > maxPooledPayload {
+		return false
 	}
-
-	c.logger.Printf("Published telemetry to %s: %.2f %s", topic, msg.Value, msg.Unit)
-	return nil
+	buf.Reset()
+	payloadPool.Put(buf)
+	return true
 }
 
 // publishCommandResponse публикует ответ на команду в MQTT
 func (c *Client) publishCommandResponse(response CommandResponse) error {
-	if c.mqttClient == nil || !c.mqttClient.IsConnected() {
+	if !c.IsConnected() {
 		return fmt.Errorf("MQTT client not connected")
 	}
 
@@ -319,7 +447,9 @@ func (c *Client) publishCommandResponse(response CommandResponse) error {
 		return fmt.Errorf("failed to publish response to topic %s: %v", topic, token.Error())
 	}
 
-	c.logger.Printf("Published command response to %s: %s", topic, response.Status)
+	if common.DebugEnabled() {
+		c.logger.Printf("Published command response to %s: %s", topic, response.Status)
+	}
 	return nil
 }
 
@@ -329,9 +459,10 @@ func (c *Client) SetVIN(vin string) {
 	c.logger.Printf("VIN set to: %s", vin)
 }
 
-// IsConnected возвращает true если клиент подключен к брокеру
+// IsConnected возвращает true если клиент подключен к брокеру или, при AutoReconnect, переподключается.
+// Использует флаг из обработчиков подключения вместо вызова paho IsConnected под мьютексом
 func (c *Client) IsConnected() bool {
-	return c.mqttClient != nil && c.mqttClient.IsConnected()
+	return c.mqttClient != nil && c.connected.Load()
 }
 
 // PublishCommandResponse публикует ответ на команду (может быть вызван извне)
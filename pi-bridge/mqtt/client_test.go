@@ -1,12 +1,16 @@
 package mqtt
 
 import (
+	"encoding/json"
+	"errors"
 	"log"
 	"os"
 	"testing"
 	"time"
 
 	"elm327-bridge/obd"
+
+	mqttLib "github.com/eclipse/paho.mqtt.golang"
 )
 
 func TestDefaultConfig(t *testing.T) {
@@ -89,6 +93,22 @@ func TestConvertToTelemetryMessage(t *testing.T) {
 	}
 }
 
+func TestConvertToTelemetryMessagePointer(t *testing.T) {
+	client := &Client{
+		vin:    "TEST123",
+		logger: log.New(os.Stdout, "[Test] ", log.LstdFlags),
+	}
+
+	// Парсер OBD отправляет в канал телеметрии указатель
+	msg, err := client.convertToTelemetryMessage(&obd.Telemetry{PID: "0D", Metric: "vehicle_speed", Value: 60, Unit: "km/h"})
+	if err != nil {
+		t.Fatalf("Failed to convert telemetry pointer: %v", err)
+	}
+	if msg.Metric != "vehicle_speed" || msg.Value != 60 {
+		t.Errorf("Unexpected message: %+v", msg)
+	}
+}
+
 func TestConvertToTelemetryMessageUnsupportedType(t *testing.T) {
 	logger := log.New(os.Stdout, "[Test] ", log.LstdFlags)
 	client := &Client{
@@ -102,6 +122,198 @@ func TestConvertToTelemetryMessageUnsupportedType(t *testing.T) {
 	}
 }
 
+func TestIsConnectedTracksConnectionLost(t *testing.T) {
+	client := &Client{
+		mqttClient: mqttLib.NewClient(mqttLib.NewClientOptions()),
+		logger:     log.New(os.Stdout, "[Test] ", log.LstdFlags),
+	}
+
+	client.connected.Store(true)
+	if !client.IsConnected() {
+		t.Fatal("Expected IsConnected to return true")
+	}
+
+	client.onConnectionLostHandler(nil, errors.New("connection reset"))
+	if client.IsConnected() {
+		t.Error("Expected IsConnected to return false after connection lost")
+	}
+}
+
+func TestIsConnectedWhileAutoReconnecting(t *testing.T) {
+	client := &Client{
+		config:     Config{AutoReconnect: true},
+		mqttClient: mqttLib.NewClient(mqttLib.NewClientOptions()),
+		logger:     log.New(os.Stdout, "[Test] ", log.LstdFlags),
+	}
+
+	client.connected.Store(true)
+	client.onConnectionLostHandler(nil, errors.New("connection reset"))
+
+	// paho переподключается сам и сохраняет публикации, их не нужно отбрасывать
+	if !client.IsConnected() {
+		t.Error("Expected IsConnected to return true while auto-reconnecting")
+	}
+}
+
+func TestDrainTelemetry(t *testing.T) {
+	telemetryChan := make(chan interface{}, 10)
+	for i := 0; i < 5; i++ {
+		telemetryChan <- i
+	}
+
+	// Пачка ограничена maxBatch, остаток остается в канале
+	batch := drainTelemetry(telemetryChan, -1, 4)
+	if len(batch) != 4 {
+		t.Fatalf("Expected batch of 4, got %d", len(batch))
+	}
+	if batch[0] != -1 || batch[3] != 2 {
+		t.Errorf("Unexpected batch order: %v", batch)
+	}
+
+	// Не блокируется на пустом канале
+	batch = drainTelemetry(telemetryChan, -1, 4)
+	if len(batch) != 3 {
+		t.Errorf("Expected batch of 3, got %d", len(batch))
+	}
+}
+
+// fakeToken - завершенный токен публикации с заданной ошибкой
+type fakeToken struct {
+	err error
+}
+
+func (t *fakeToken) Wait() bool                     { return true }
+func (t *fakeToken) WaitTimeout(time.Duration) bool { return true }
+func (t *fakeToken) Done() <-chan struct{} {
+	done := make(chan struct{})
+	close(done)
+	return done
+}
+func (t *fakeToken) Error() error { return t.err }
+
+func TestAwaitPublishesReleasesOnlyAckedPayloads(t *testing.T) {
+	client := &Client{
+		logger: log.New(os.Stdout, "[Test] ", log.LstdFlags),
+	}
+
+	acked := newPayloadBuffer()
+	acked.WriteString(`{"metric":"rpm"}`)
+	failed := newPayloadBuffer()
+	failed.WriteString(`{"metric":"speed"}`)
+	msg := &TelemetryMessage{Metric: "rpm"}
+
+	client.awaitPublishes([]pendingPublish{
+		{token: &fakeToken{}, topic: "car/data/rpm", msg: msg, buf: acked},
+		{token: &fakeToken{err: errors.New("not acked")}, topic: "car/data/speed", msg: msg, buf: failed},
+	})
+
+	// Подтвержденный буфер очищен и возвращен в пул
+	if acked.Len() != 0 {
+		t.Errorf("Expected acked payload to be released, got %q", acked.String())
+	}
+	// Буфер с ошибкой не трогаем: paho может еще повторить отправку
+	if failed.String() != `{"metric":"speed"}` {
+		t.Errorf("Expected failed payload to be kept, got %q", failed.String())
+	}
+}
+
+func TestReleasePayloadCap(t *testing.T) {
+	if !releasePayload(newPayloadBuffer()) {
+		t.Error("Expected small buffer to be pooled")
+	}
+
+	large := newPayloadBuffer()
+	large.Grow(maxPooledPayload + 1)
+	large.WriteString("payload")
+	if releasePayload(large) {
+		t.Error("Expected buffer above maxPooledPayload to be dropped")
+	}
+	if large.Len() == 0 {
+		t.Error("Expected dropped buffer to be left untouched")
+	}
+}
+
+func TestPayloadBufferReusesEncoder(t *testing.T) {
+	buf := newPayloadBuffer()
+	if err := buf.enc.Encode(&TelemetryMessage{Metric: "rpm"}); err != nil {
+		t.Fatalf("Encode failed: %v", err)
+	}
+	buf.Reset()
+
+	// После очистки тот же Encoder пишет в пустой буфер
+	if err := buf.enc.Encode(&TelemetryMessage{Metric: "speed"}); err != nil {
+		t.Fatalf("Encode failed: %v", err)
+	}
+	var msg TelemetryMessage
+	if err := json.Unmarshal(buf.Bytes(), &msg); err != nil {
+		t.Fatalf("Expected a single JSON payload, got %q: %v", buf.String(), err)
+	}
+	if msg.Metric != "speed" {
+		t.Errorf("Expected metric speed, got %s", msg.Metric)
+	}
+}
+
+// publishedMessage - сообщение, переданное в fakeMQTTClient.Publish
+type publishedMessage struct {
+	topic   string
+	payload []byte
+}
+
+// fakeMQTTClient записывает публикации; остальные методы paho клиента не используются
+type fakeMQTTClient struct {
+	mqttLib.Client
+	published chan publishedMessage
+}
+
+func (f *fakeMQTTClient) Publish(topic string, qos byte, retained bool, payload interface{}) mqttLib.Token {
+	// Буфер payload возвращается в пул после подтверждения, поэтому копируем его
+	f.published <- publishedMessage{topic: topic, payload: append([]byte(nil), payload.([]byte)...)}
+	return &fakeToken{}
+}
+
+func TestPublishTelemetryLoopWithParserOutput(t *testing.T) {
+	responsesChan := make(chan string, 1)
+	telemetryChan := make(chan interface{}, 10)
+	go obd.StartParser(responsesChan, telemetryChan, nil)
+	defer close(responsesChan)
+
+	fake := &fakeMQTTClient{published: make(chan publishedMessage, 10)}
+	client := &Client{
+		config:        Config{DataTopic: "car/telemetry", QoS: 1},
+		mqttClient:    fake,
+		telemetryChan: telemetryChan,
+		stopChan:      make(chan struct{}),
+		logger:        log.New(os.Stdout, "[Test] ", log.LstdFlags),
+		vin:           "TEST123",
+	}
+	client.connected.Store(true)
+
+	client.wg.Add(1)
+	go client.publishTelemetryLoop()
+
+	responsesChan <- "41 0C 1A F8"
+
+	select {
+	case published := <-fake.published:
+		if published.topic != "car/telemetry/TEST123/engine_rpm" {
+			t.Errorf("Unexpected topic %s", published.topic)
+		}
+
+		var msg TelemetryMessage
+		if err := json.Unmarshal(published.payload, &msg); err != nil {
+			t.Fatalf("Failed to unmarshal payload %q: %v", published.payload, err)
+		}
+		if msg.PID != "0C" || msg.Value != 1726 || msg.Unit != "rpm" {
+			t.Errorf("Unexpected telemetry message: %+v", msg)
+		}
+	case <-time.After(time.Second):
+		t.Fatal("Timeout waiting for telemetry to be published")
+	}
+
+	close(client.stopChan)
+	client.wg.Wait()
+}
+
 func TestCommandMessageStructure(t *testing.T) {
 	cmd := CommandMessage{
 		Command:       "010C",
@@ -166,7 +378,6 @@ func TestClientCreation(t *testing.T) {
 	commandsChan := make(chan string, 10)
 	responsesChan := make(chan CommandResponse, 10)
 
-	logger := log.New(os.Stdout, "[Test] ", log.LstdFlags)
 	client := NewClient(config, telemetryChan, commandsChan, responsesChan)
 
 	if client == nil {
@@ -208,3 +419,74 @@ func TestIsConnected(t *testing.T) {
 		t.Error("Expected IsConnected to return false for nil client")
 	}
 }
+
+// fakeMessage - минимальная реализация mqttLib.Message для тестов
+type fakeMessage struct {
+	topic   string
+	payload []byte
+}
+
+func (m *fakeMessage) Duplicate() bool   { return false }
+func (m *fakeMessage) Qos() byte         { return 1 }
+func (m *fakeMessage) Retained() bool    { return false }
+func (m *fakeMessage) Topic() string     { return m.topic }
+func (m *fakeMessage) MessageID() uint16 { return 1 }
+func (m *fakeMessage) Payload() []byte   { return m.payload }
+func (m *fakeMessage) Ack()              {}
+
+func TestOnCommandReceivedForwardsCommand(t *testing.T) {
+	commandsChan := make(chan string, 1)
+	client := &Client{
+		commandsChan: commandsChan,
+		logger:       log.New(os.Stdout, "[Test] ", log.LstdFlags),
+	}
+
+	msg := &fakeMessage{
+		topic:   "car/command/TEST123/request",
+		payload: []byte(`{"command":"010C","correlation_id":"test-123"}`),
+	}
+	client.onCommandReceived(nil, msg)
+
+	select {
+	case command := <-commandsChan:
+		if command != "010C" {
+			t.Errorf("Expected command '010C', got %s", command)
+		}
+	default:
+		t.Error("Expected command to be forwarded without waiting")
+	}
+}
+
+func TestOnCommandReceivedDropsWhenChannelFull(t *testing.T) {
+	commandsChan := make(chan string, 1)
+	commandsChan <- "0100"
+	client := &Client{
+		commandsChan: commandsChan,
+		logger:       log.New(os.Stdout, "[Test] ", log.LstdFlags),
+	}
+
+	msg := &fakeMessage{
+		topic:   "car/command/TEST123/request",
+		payload: []byte(`{"command":"010C","correlation_id":"test-123"}`),
+	}
+
+	// Обработчик не должен блокировать сетевой цикл paho
+	done := make(chan struct{})
+	go func() {
+		client.onCommandReceived(nil, msg)
+		close(done)
+	}()
+
+	select {
+	case <-done:
+	case <-time.After(time.Second):
+		t.Fatal("Expected handler to return while commands channel is full")
+	}
+
+	if command := <-commandsChan; command != "0100" {
+		t.Errorf("Expected queued command '0100' to stay first, got %s", command)
+	}
+	if len(commandsChan) != 0 {
+		t.Error("Expected command to be dropped when channel is full")
+	}
+}
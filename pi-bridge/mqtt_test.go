@@ -1,139 +0,0 @@
-package main
-
-import (
-	"encoding/base64"
-	"testing"
-
-	mqtt "github.com/eclipse/paho.mqtt.golang"
-	"github.com/stretchr/testify/assert"
-	"github.com/stretchr/testify/mock"
-)
-
-// MockMQTTClient для тестирования
-type MockMQTTClient struct {
-	mock.Mock
-}
-
-func (m *MockMQTTClient) Connect() mqtt.Token {
-	args := m.Called()
-	return args.Get(0).(mqtt.Token)
-}
-
-func (m *MockMQTTClient) Publish(topic string, qos byte, retained bool, payload interface{}) mqtt.Token {
-	args := m.Called(topic, qos, retained, payload)
-	return args.Get(0).(mqtt.Token)
-}
-
-func (m *MockMQTTClient) Subscribe(topic string, qos byte, callback mqtt.MessageHandler) mqtt.Token {
-	args := m.Called(topic, qos, callback)
-	return args.Get(0).(mqtt.Token)
-}
-
-func (m *MockMQTTClient) SubscribeMultiple(filters map[string]byte, callback mqtt.MessageHandler) mqtt.Token {
-	args := m.Called(filters, callback)
-	return args.Get(0).(mqtt.Token)
-}
-
-func (m *MockMQTTClient) Unsubscribe(topics ...string) mqtt.Token {
-	args := m.Called(topics)
-	return args.Get(0).(mqtt.Token)
-}
-
-func (m *MockMQTTClient) IsConnected() bool {
-	args := m.Called()
-	return args.Bool(0)
-}
-
-func (m *MockMQTTClient) IsConnectionOpen() bool {
-	args := m.Called()
-	return args.Bool(0)
-}
-
-func (m *MockMQTTClient) Disconnect(quiesce uint) {
-	m.Called(quiesce)
-}
-
-func (m *MockMQTTClient) OptionsReader() mqtt.ClientOptionsReader {
-	args := m.Called()
-	return args.Get(0).(mqtt.ClientOptionsReader)
-}
-
-func TestOnCommandReceived(t *testing.T) {
-	// Test base64 decoding logic in onCommandReceived
-	encoded := "QVRa" // base64 for "ATZ"
-	decoded, err := base64.StdEncoding.DecodeString(encoded)
-	assert.NoError(t, err)
-	assert.Equal(t, []byte("ATZ"), decoded)
-}
-
-func TestOnCommandReceivedInvalidBase64(t *testing.T) {
-	// Test invalid base64 decoding
-	encoded := "invalid_base64"
-	_, err := base64.StdEncoding.DecodeString(encoded)
-	assert.Error(t, err)
-}
-
-// Mock Message для MQTT
-type mockMQTTMessage struct {
-	topic   string
-	payload []byte
-}
-
-func (m *mockMQTTMessage) Topic() string {
-	return m.topic
-}
-
-func (m *mockMQTTMessage) Payload() []byte {
-	return m.payload
-}
-
-func (m *mockMQTTMessage) Qos() byte {
-	return 1
-}
-
-func (m *mockMQTTMessage) Retained() bool {
-	return false
-}
-
-func (m *mockMQTTMessage) Dup() bool {
-	return false
-}
-
-func (m *mockMQTTMessage) Duplicate() bool {
-	return false
-}
-
-func (m *mockMQTTMessage) Acknowledged() bool {
-	return false
-}
-
-func (m *mockMQTTMessage) Ack() {
-}
-
-func TestPublishMQTT(t *testing.T) {
-	// Test base64 encoding for publish
-	data := []byte("0100>41 00 BE 7F")
-	encoded := base64.StdEncoding.EncodeToString(data)
-	expected := "MDEwMD40MSAwMCBCRSA3Rg=="
-
-	assert.Equal(t, expected, encoded)
-}
-
-type mockToken struct {
-	mock.Mock
-}
-
-func (m *mockToken) Wait() bool {
-	args := m.Called()
-	return args.Bool(0)
-}
-
-func (m *mockToken) WaitTimeout(timeout uint) bool {
-	args := m.Called(timeout)
-	return args.Bool(0)
-}
-
-func (m *mockToken) Error() error {
-	args := m.Called()
-	return args.Error(0)
-}
@@ -287,7 +287,9 @@ func ParseResponse(response string) (*Telemetry, error) {
 		Raw:       response,
 	}
 
-	logger.Printf("Parsed telemetry: %s = %.2f %s", metric, value, unit)
+	if common.DebugEnabled() {
+		logger.Printf("Parsed telemetry: %s = %.2f %s", metric, value, unit)
+	}
 	return telemetry, nil
 }
 
@@ -344,7 +346,9 @@ func StartParser(responsesChan <-chan string, telemetryChan chan<- interface{},
 			// Отправляем в канал телеметрии
 			select {
 			case telemetryChan <- telemetry:
-				logger.Printf("Telemetry sent: %s = %.2f %s", telemetry.Metric, telemetry.Value, telemetry.Unit)
+				if common.DebugEnabled() {
+					logger.Printf("Telemetry sent: %s = %.2f %s", telemetry.Metric, telemetry.Value, telemetry.Unit)
+				}
 			default:
 				logger.Printf("Warning: telemetry channel is full, dropping: %s", telemetry.Metric)
 			}
@@ -372,7 +376,9 @@ func StartCommandManager(commandsChan chan<- string) {
 
 				select {
 				case commandsChan <- command:
-					logger.Printf("Sent command: %s", command)
+					if common.DebugEnabled() {
+						logger.Printf("Sent command: %s", command)
+					}
 				default:
 					logger.Printf("Warning: commands channel is full, skipping: %s", command)
 				}